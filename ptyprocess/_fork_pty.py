@@ -1,7 +1,9 @@
 """Substitute for the forkpty system call, to support Solaris.
 """
+import fcntl
 import os
 import errno
+import termios
 
 from pty import (STDIN_FILENO, STDOUT_FILENO, STDERR_FILENO, CHILD)
 from .util import PtyProcessError
@@ -45,8 +47,6 @@ def pty_make_controlling_tty(tty_fd):
     more portable than the pty.fork() function. Specifically, this should
     work on Solaris. '''
 
-    child_name = os.ttyname(tty_fd)
-
     # Disconnect from controlling tty, if any.  Raises OSError of ENXIO
     # if there was no controlling tty to begin with, such as when
     # executed by a cron(1) job.
@@ -69,10 +69,17 @@ def pty_make_controlling_tty(tty_fd):
         if err.errno != errno.ENXIO:
             raise
 
-    # Verify we can open child pty.
-    fd = os.open(child_name, os.O_RDWR)
-    os.close(fd)
+    try:
+        fcntl.ioctl(tty_fd, termios.TIOCSCTTY, 0)
+    except (AttributeError, OSError):
+        # No TIOCSCTTY: on SVR4, opening the tty as a session leader with
+        # no controlling tty makes it the controlling tty.
+        child_name = os.ttyname(tty_fd)
+
+        # Verify we can open child pty.
+        fd = os.open(child_name, os.O_RDWR)
+        os.close(fd)
 
-    # Verify we now have a controlling tty.
-    fd = os.open("/dev/tty", os.O_WRONLY)
-    os.close(fd)
+        # Verify we now have a controlling tty.
+        fd = os.open("/dev/tty", os.O_WRONLY)
+        os.close(fd)
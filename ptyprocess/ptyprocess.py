@@ -5,46 +5,86 @@ import io
 import os
 import pty
 import resource
+import select
 import signal
 import struct
 import sys
 import termios
 import time
+import weakref
 
-try:
-    import builtins  # Python 3
-except ImportError:
-    import __builtin__ as builtins  # Python 2
+import builtins
 
 # Constants
-from pty import (STDIN_FILENO, CHILD)
+from pty import (STDIN_FILENO, STDOUT_FILENO, STDERR_FILENO, CHILD)
 
 from .util import which, PtyProcessError
 
 _platform = sys.platform.lower()
 
 # Solaris uses internal __fork_pty(). All others use pty.fork().
-_is_solaris = (
-    _platform.startswith('solaris') or
-    _platform.startswith('sunos'))
+_is_solaris = _platform.startswith(('solaris', 'sunos'))
+_is_linux = _platform.startswith('linux')
+use_native_pty_fork = not _is_solaris
 
 if _is_solaris:
-    use_native_pty_fork = False
     from . import _fork_pty
-else:
-    use_native_pty_fork = True
 
-PY3 = sys.version_info[0] >= 3
+# Linux >= 5.3 (Python >= 3.9) can notify us when a child exits.
+_has_pidfd = hasattr(os, 'pidfd_open')
 
-if PY3:
-    def _byte(i):
-        return bytes([i])
-else:
-    def _byte(i):
-        return chr(i)
-    
-    class FileNotFoundError(OSError): pass
-    class TimeoutError(OSError): pass
+# BSD and macOS can do the same with kqueue.
+_has_kqueue = hasattr(select, 'kqueue')
+
+# Elsewhere, waitid() with WNOWAIT lets us check for exit without reaping.
+_has_waitid = hasattr(os, 'waitid') and hasattr(os, 'WNOWAIT')
+
+# writelines() can send several buffers with one writev() call, up to the
+# platform's limit on how many one call takes.
+_has_writev = hasattr(os, 'writev')
+try:
+    _iov_max = os.sysconf('SC_IOV_MAX')
+except (AttributeError, ValueError, OSError):
+    _iov_max = -1
+if _iov_max <= 0:
+    # The smallest limit POSIX allows
+    _iov_max = 16
+
+# poll() has no FD_SETSIZE limit like select(), but doesn't work with ttys on
+# macOS.
+_use_poll = hasattr(select, 'poll') and _platform != 'darwin'
+
+# Linux lists a process's open file descriptors here.
+_has_proc_fd = os.path.isdir('/proc/self/fd')
+
+def _glibc_version():
+    """Return the glibc version as a tuple, or None if this isn't glibc."""
+    try:
+        name, version = os.confstr('CS_GNU_LIBC_VERSION').split()
+        return tuple(int(v) for v in version.split('.')[:2])
+    except (AttributeError, ValueError, OSError):
+        return None
+
+# posix_spawn() avoids copying the parent's page tables like fork() does. It
+# can only set up the pty where a session leader opening a tty acquires it as
+# its controlling terminal, as Linux does. glibc before 2.24 doesn't report
+# exec failures from posix_spawn(), so there we use fork() to raise them.
+_use_posix_spawn = (
+    _is_linux and _has_proc_fd and
+    hasattr(os, 'posix_spawn') and
+    (_glibc_version() or (2, 24)) >= (2, 24))
+
+# Byte sent by sendcontrol() for each (lowercase) character it accepts.
+_CONTROL_CHARS = dict((chr(a), bytes((a - ord('a') + 1,)))
+                      for a in range(ord('a'), ord('z') + 1))
+_CONTROL_CHARS.update((char, bytes((a,))) for char, a in [
+    ('@', 0), ('`', 0),
+    ('[', 27), ('{', 27),
+    ('\\', 28), ('|', 28),
+    (']', 29), ('}', 29),
+    ('^', 30), ('~', 30),
+    ('_', 31),
+    ('?', 127)])
 
 _EOF, _INTR = None, None
 
@@ -72,8 +112,9 @@ def _make_eof_intr():
         if fd is None:
             # no fd, raise ValueError to fallback on CEOF, CINTR
             raise ValueError("No stream has a fileno")
-        intr = ord(termios.tcgetattr(fd)[6][VINTR])
-        eof = ord(termios.tcgetattr(fd)[6][VEOF])
+        cc = termios.tcgetattr(fd)[6]
+        intr = ord(cc[VINTR])
+        eof = ord(cc[VEOF])
     except (ImportError, OSError, IOError, ValueError, termios.error):
         # unless the controlling process is also not a terminal,
         # such as cron(1), or when stdin and stdout are both closed.
@@ -85,8 +126,50 @@ def _make_eof_intr():
             #                         ^C, ^D
             (intr, eof) = (3, 4)
     
-    _INTR = _byte(intr)
-    _EOF = _byte(eof)
+    _INTR = bytes((intr,))
+    _EOF = bytes((eof,))
+
+# Commands resolved on $PATH by spawn(), keyed on (command, PATH). Like a
+# shell's hash table, a command installed later in an earlier $PATH directory
+# isn't picked up until $PATH changes.
+_which_cache = {}
+
+def _which(command):
+    """Like which(), but remembers commands found on $PATH.
+
+    Misses aren't cached, so a command installed later will still be found.
+    A cached command which is no longer executable is looked up again.
+    """
+    if (os.path.isabs(command) and os.access(command, os.X_OK)
+            and not os.path.isdir(command)):
+        # Nothing to look up.
+        return command
+    if os.path.dirname(command):
+        # Relative to the working directory, or absolute; no $PATH walk.
+        return which(command)
+    key = (command, os.environ.get('PATH'))
+    command_with_path = _which_cache.get(key)
+    if command_with_path is not None and os.access(command_with_path,
+                                                   os.X_OK):
+        return command_with_path
+    command_with_path = which(command)
+    # Relative $PATH entries like '.' depend on the working directory.
+    if command_with_path is not None and os.path.isabs(command_with_path):
+        if len(_which_cache) >= 256:
+            _which_cache.clear()
+        _which_cache[key] = command_with_path
+    return command_with_path
+
+# struct winsize: rows, cols, xpixel, ypixel
+_winsize = struct.Struct('HHHH')
+_winsize_empty = _winsize.pack(0, 0, 0, 0)
+
+# Some very old platforms have a bug that causes the value for
+# termios.TIOCSWINSZ to be truncated. There was a hack here to work
+# around this, but it caused problems with newer platforms so has been
+# removed. For details see https://github.com/pexpect/pexpect/issues/39
+_TIOCSWINSZ = getattr(termios, 'TIOCSWINSZ', -2146929561)
+_TIOCGWINSZ = getattr(termios, 'TIOCGWINSZ', 1074295912)
 
 # setecho and setwinsize are pulled out here because on some platforms, we need
 # to do this from the child before we exec()
@@ -116,14 +199,212 @@ def _setecho(fd, state):
         raise
 
 def _setwinsize(fd, rows, cols):
-    # Some very old platforms have a bug that causes the value for
-    # termios.TIOCSWINSZ to be truncated. There was a hack here to work
-    # around this, but it caused problems with newer platforms so has been
-    # removed. For details see https://github.com/pexpect/pexpect/issues/39
-    TIOCSWINSZ = getattr(termios, 'TIOCSWINSZ', -2146929561)
     # Note, assume ws_xpixel and ws_ypixel are zero.
-    s = struct.pack('HHHH', rows, cols, 0, 0)
-    fcntl.ioctl(fd, TIOCSWINSZ, s)
+    s = _winsize.pack(rows, cols, 0, 0)
+    fcntl.ioctl(fd, _TIOCSWINSZ, s)
+
+def _close_fds(keep_fds):
+    """Close all file descriptors above 2 except those in ``keep_fds``.
+
+    Where /proc/self/fd is available, only the descriptors which are actually
+    open are closed, rather than every number up to RLIMIT_NOFILE.
+    """
+    if _has_proc_fd:
+        try:
+            open_fds = [int(fd) for fd in os.listdir('/proc/self/fd')]
+        except OSError:
+            pass
+        else:
+            for fd in open_fds:
+                if fd > 2 and fd not in keep_fds:
+                    try:
+                        os.close(fd)
+                    except OSError:
+                        # The fd listdir() used is already closed.
+                        pass
+            return
+
+    # Impose ceiling on max_fd: AIX bugfix for users with unlimited
+    # nofiles where resource.RLIMIT_NOFILE is 2^63-1 and os.closerange()
+    # occasionally raises out of range error
+    max_fd = min(1048576, resource.getrlimit(resource.RLIMIT_NOFILE)[0])
+    skeep_fds = sorted(keep_fds)
+    for pair in zip([2] + skeep_fds, skeep_fds + [max_fd]):
+        os.closerange(pair[0]+1, pair[1])
+
+def _posix_spawn_pty(command, argv, env, echo, dimensions, pass_fds):
+    """Run ``command`` in a new pty using posix_spawn() instead of fork().
+
+    This can't run anything in the child before exec, so it is only used when
+    spawn() has no preexec_fn or cwd. Returns (pid, fd) like pty.fork() does
+    in the parent, or None if the pty couldn't be set up for posix_spawn(),
+    in which case spawn() should use fork() instead.
+    """
+    parent_fd, child_fd = os.openpty()
+    try:
+        try:
+            try:
+                _setwinsize(child_fd, *dimensions)
+            except IOError as err:
+                if err.args[0] not in (errno.EINVAL, errno.ENOTTY):
+                    raise
+            if not echo:
+                try:
+                    _setecho(child_fd, False)
+                except (IOError, termios.error) as err:
+                    if err.args[0] not in (errno.EINVAL, errno.ENOTTY):
+                        raise
+
+            # Close everything the child would otherwise inherit, except
+            # pass_fds. Most descriptors are already close-on-exec.
+            file_actions = []
+            for fd in os.listdir('/proc/self/fd'):
+                fd = int(fd)
+                if fd <= 2 or fd in pass_fds:
+                    continue
+                try:
+                    if os.get_inheritable(fd):
+                        file_actions.append((os.POSIX_SPAWN_CLOSE, fd))
+                except OSError:
+                    # The fd listdir() used is already closed.
+                    pass
+            # The child is made a session leader before the file actions
+            # run, so opening the tty makes it the controlling terminal.
+            file_actions += [
+                (os.POSIX_SPAWN_OPEN, STDIN_FILENO, os.ttyname(child_fd),
+                 os.O_RDWR, 0),
+                (os.POSIX_SPAWN_DUP2, STDIN_FILENO, STDOUT_FILENO),
+                (os.POSIX_SPAWN_DUP2, STDIN_FILENO, STDERR_FILENO),
+            ]
+        except (OSError, termios.error):
+            # e.g. ttyname() can't find the pty because /dev/pts is another
+            # devpts instance. fork() needs none of this.
+            os.close(parent_fd)
+            return None
+
+        if env is None:
+            env = os.environ
+        try:
+            pid = os.posix_spawn(command, argv, env,
+                                 file_actions=file_actions, setsid=True)
+        except:
+            os.close(parent_fd)
+            raise
+    finally:
+        os.close(child_fd)
+    return pid, parent_fd
+
+def _wait_readable(fd, timeout):
+    """Wait up to ``timeout`` seconds for ``fd`` to be readable.
+
+    Returns True if it is (or has hung up).
+    """
+    if _use_poll:
+        poller = select.poll()
+        poller.register(fd, select.POLLIN)
+        return bool(poller.poll(timeout * 1000))
+    return bool(select.select([fd], [], [], timeout)[0])
+
+def _pidfd_open(pid):
+    """Return a pidfd for ``pid``, or None if the platform can't provide one.
+    """
+    if not _has_pidfd:
+        return None
+    try:
+        return os.pidfd_open(pid)
+    except OSError:
+        # e.g. ENOSYS on kernels older than 5.3
+        return None
+
+def _wait_exit(pid, pidfd, timeout):
+    """Wait up to ``timeout`` seconds for the child ``pid`` to exit.
+
+    ``pidfd`` is a pidfd for it, or None. See PtyProcess._wait_for_exit().
+    """
+    if pidfd is not None:
+        poller = select.poll()
+        poller.register(pidfd, select.POLLIN)
+        poller.poll(timeout * 1000)
+        return
+    if _has_kqueue:
+        kq = select.kqueue()
+        try:
+            events = kq.control([select.kevent(
+                pid, filter=select.KQ_FILTER_PROC,
+                flags=select.KQ_EV_ADD | select.KQ_EV_ONESHOT,
+                fflags=select.KQ_NOTE_EXIT)], 1, timeout)
+        except OSError as err:
+            error = err.errno
+        else:
+            # BSD and macOS report a failure to register the event as an
+            # event with KQ_EV_ERROR set, rather than raising it.
+            error = None
+            for event in events:
+                if event.flags & select.KQ_EV_ERROR:
+                    error = event.data
+        finally:
+            kq.close()
+        if error is None or error == errno.ESRCH:
+            # Exited (ESRCH: before we started watching), or timed out.
+            return
+        # Couldn't watch the child; fall back to polling.
+    if _has_waitid:
+        deadline = time.monotonic() + timeout
+        delay = 0.001
+        while True:
+            try:
+                if os.waitid(os.P_PID, pid, os.WEXITED | os.WNOHANG
+                             | os.WNOWAIT) is not None:
+                    return
+            except ChildProcessError:
+                # Already reaped.
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.05)
+    time.sleep(timeout)
+
+class _FinalizeState(object):
+    """The parts of a PtyProcess which _finalize() needs.
+
+    This is kept out of the instance ``__dict__``, so that the finalizer
+    doesn't hold on to attributes which may refer back to the instance and
+    keep it alive.
+    """
+    __slots__ = ('pid', 'fd', 'pidfd', 'terminated', 'delayafterclose')
+
+    def __init__(self, pid, fd, pidfd, delayafterclose):
+        self.pid = pid
+        self.fd = fd
+        self.pidfd = pidfd
+        self.terminated = False
+        self.delayafterclose = delayafterclose
+
+def _finalize(state):
+    """Clean up after a PtyProcess which was never closed.
+
+    ``state`` is its _FinalizeState. Closing the pty hangs up the child,
+    which is given ``delayafterclose`` seconds to exit before it is killed
+    with SIGKILL. Either way it is reaped. Unlike ``close()``, SIGHUP and
+    SIGINT aren't sent separately first.
+    """
+    if state.fd != -1:
+        os.close(state.fd)
+    pid, pidfd = state.pid, state.pidfd
+    try:
+        if not state.terminated:
+            _wait_exit(pid, pidfd, state.delayafterclose)
+            if os.waitpid(pid, os.WNOHANG)[0] == 0:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+    except OSError:
+        # Someone else already reaped it.
+        pass
+    finally:
+        if pidfd is not None:
+            os.close(pidfd)
 
 class PtyProcess(object):
     '''This class represents a process running in a pseudoterminal.
@@ -131,21 +412,16 @@ class PtyProcess(object):
     The main constructor is the :meth:`spawn` classmethod.
     '''
     string_type = bytes
-    if PY3:
-        linesep = os.linesep.encode('ascii')
-        crlf = '\r\n'.encode('ascii')
+    linesep = os.linesep.encode('ascii')
+    crlf = '\r\n'.encode('ascii')
 
-        @staticmethod
-        def write_to_stdout(b):
-            try:
-                return sys.stdout.buffer.write(b)
-            except AttributeError:
-                # If stdout has been replaced, it may not have .buffer
-                return sys.stdout.write(b.decode('ascii', 'replace'))
-    else:
-        linesep = os.linesep
-        crlf = '\r\n'
-        write_to_stdout = sys.stdout.write
+    @staticmethod
+    def write_to_stdout(b):
+        try:
+            return sys.stdout.buffer.write(b)
+        except AttributeError:
+            # If stdout has been replaced, it may not have .buffer
+            return sys.stdout.write(b.decode('ascii', 'replace'))
 
     encoding = None
     
@@ -154,12 +430,14 @@ class PtyProcess(object):
     launch_dir = None
 
     def __init__(self, pid, fd):
-        _make_eof_intr()  # Ensure _EOF and _INTR are calculated
+        if _EOF is None:
+            _make_eof_intr()  # Ensure _EOF and _INTR are calculated
         self.pid = pid
         self.fd = fd
-        readf = io.open(fd, 'rb', buffering=0)
-        writef = io.open(fd, 'wb', buffering=0, closefd=False)
-        self.fileobj = io.BufferedRWPair(readf, writef)
+        # Data read past the end of a line by readline()
+        self._read_buffer = b''
+        # Data held back by write(s, flush=False)
+        self._write_buffer = bytearray()
 
         self.terminated = False
         self.closed = False
@@ -174,6 +452,15 @@ class PtyProcess(object):
         # Used by terminate() to give kernel time to update process status.
         # Time in seconds.
         self.delayafterterminate = 0.1
+        # Becomes readable when the child exits, where supported.
+        self._pidfd = _pidfd_open(pid)
+        # Make sure no system resources are left open if we're garbage
+        # collected without close(). This mustn't reference self, so it gets
+        # its own copy of the state it needs, which is kept up to date.
+        self._finalize_state = _FinalizeState(
+            pid, fd, self._pidfd, self.delayafterclose)
+        self._finalizer = weakref.finalize(self, _finalize,
+                                           self._finalize_state)
 
     @classmethod
     def spawn(
@@ -210,13 +497,31 @@ class PtyProcess(object):
         argv = argv[:]
         command = argv[0]
 
-        command_with_path = which(command)
+        command_with_path = _which(command)
         if command_with_path is None:
             raise FileNotFoundError('The command was not found or was not ' +
                                     'executable: %s.' % command)
         command = command_with_path
         argv[0] = command
 
+        global _use_posix_spawn
+        if _use_posix_spawn and preexec_fn is None and cwd is None:
+            try:
+                spawned = _posix_spawn_pty(command, argv, env, echo,
+                                           dimensions, pass_fds)
+            except NotImplementedError:
+                # Python was built without POSIX_SPAWN_SETSID (glibc < 2.26),
+                # so setsid=True isn't available. Use fork() from now on.
+                _use_posix_spawn = False
+                spawned = None
+            if spawned is not None:
+                pid, fd = spawned
+                inst = cls(pid, fd)
+                inst.argv = argv
+                if env is not None:
+                    inst.env = env
+                return inst
+
         # [issue #119] To prevent the case where exec fails and the user is
         # stuck interacting with a python child process instead of whatever
         # was expected, we implement the solution from
@@ -234,7 +539,8 @@ class PtyProcess(object):
 
         # Some platforms must call setwinsize() and setecho() from the
         # child process, and others from the master process. We do both,
-        # allowing IOError for either.
+        # allowing IOError for either, except on Linux where the child's
+        # call is known to be enough.
 
         if pid == CHILD:
             # set window size
@@ -260,13 +566,7 @@ class PtyProcess(object):
             # Do not allow child to inherit open file descriptors from parent,
             # with the exception of the exec_err_pipe_write of the pipe
             # and pass_fds.
-            # Impose ceiling on max_fd: AIX bugfix for users with unlimited
-            # nofiles where resource.RLIMIT_NOFILE is 2^63-1 and os.closerange()
-            # occasionally raises out of range error
-            max_fd = min(1048576, resource.getrlimit(resource.RLIMIT_NOFILE)[0])
-            spass_fds = sorted(set(pass_fds) | {exec_err_pipe_write})
-            for pair in zip([2] + spass_fds, spass_fds + [max_fd]):
-                os.closerange(pair[0]+1, pair[1])
+            _close_fds(set(pass_fds) | {exec_err_pipe_write})
 
             if cwd is not None:
                 os.chdir(cwd)
@@ -277,8 +577,7 @@ class PtyProcess(object):
                 except Exception as e:
                     ename = type(e).__name__
                     tosend = '{}:0:{}'.format(ename, str(e))
-                    if PY3:
-                        tosend = tosend.encode('utf-8')
+                    tosend = tosend.encode('utf-8')
 
                     os.write(exec_err_pipe_write, tosend)
                     os.close(exec_err_pipe_write)
@@ -293,8 +592,7 @@ class PtyProcess(object):
                 # [issue #119] 5. If exec fails, the child writes the error
                 # code back to the parent using the pipe, then exits.
                 tosend = 'OSError:{}:{}'.format(err.errno, str(err))
-                if PY3:
-                    tosend = tosend.encode('utf-8')
+                tosend = tosend.encode('utf-8')
                 os.write(exec_err_pipe_write, tosend)
                 os.close(exec_err_pipe_write)
                 os._exit(os.EX_OSERR)
@@ -335,11 +633,12 @@ class PtyProcess(object):
             else:
                 raise exception
 
-        try:
-            inst.setwinsize(*dimensions)
-        except IOError as err:
-            if err.args[0] not in (errno.EINVAL, errno.ENOTTY, errno.ENXIO):
-                raise
+        if not _is_linux:
+            try:
+                inst.setwinsize(*dimensions)
+            except IOError as err:
+                if err.args[0] not in (errno.EINVAL, errno.ENOTTY, errno.ENXIO):
+                    raise
 
         return inst
 
@@ -367,24 +666,6 @@ class PtyProcess(object):
     def _coerce_read_string(s):
         return s
 
-    def __del__(self):
-        '''This makes sure that no system resources are left open. Python only
-        garbage collects Python objects. OS file descriptors are not Python
-        objects, so they must be handled explicitly. If the child file
-        descriptor was opened outside of this class (passed to the constructor)
-        then this does not close it. '''
-
-        if not self.closed:
-            # It is possible for __del__ methods to execute during the
-            # teardown of the Python VM itself. Thus self.close() may
-            # trigger an exception because os.close may be None.
-            try:
-                self.close()
-            # which exception, shouldn't we catch explicitly .. ?
-            except:
-                pass
-
-
     def fileno(self):
         '''This returns the file descriptor of the pty for the child.
         '''
@@ -397,22 +678,35 @@ class PtyProcess(object):
         the child is terminated (SIGKILL is sent if the child ignores SIGHUP
         and SIGINT). '''
         if not self.closed:
-            self.flush()
-            self.fileobj.close() # Closes the file descriptor
+            if self.fd != -1:
+                try:
+                    self.flush()
+                finally:
+                    os.close(self.fd)
+                    # Mark it closed straight away: if the child can't be
+                    # terminated below, the fd number may be reused before
+                    # the next close() or the finalizer runs.
+                    self.fd = self._finalize_state.fd = -1
             # Give kernel time to update process status.
-            time.sleep(self.delayafterclose)
+            self._wait_for_exit(self.delayafterclose)
             if self.isalive():
                 if not self.terminate(force):
                     raise PtyProcessError('Could not terminate the child.')
-            self.fd = -1
+            if self._pidfd is not None:
+                os.close(self._pidfd)
+                self._pidfd = self._finalize_state.pidfd = None
             self.closed = True
+            self._finalizer.detach()
             #self.pid = None
 
     def flush(self):
-        '''This does nothing. It is here to support the interface for a
-        File-like object. '''
+        '''Write out any data held back by ``write(s, flush=False)``.'''
 
-        pass
+        if self._write_buffer:
+            # Take the data out first, so that if writing it fails, later
+            # calls to flush() and close() don't fail trying again.
+            data, self._write_buffer = self._write_buffer, bytearray()
+            self._write_all(data)
 
     def isatty(self):
         '''This returns True if the file descriptor is open and connected to a
@@ -444,14 +738,30 @@ class PtyProcess(object):
 
         if timeout is not None:
             end_time = time.time() + timeout
+        # Poll with exponential backoff: a prompt usually turns echo off
+        # within a few milliseconds, so start small and back off to 100ms.
+        delay = 0.002
+        # The child normally disables echo right after writing its prompt, so
+        # wait on the pty becoming readable rather than sleeping. We don't
+        # consume that output, so the fd stays readable once it fires; after
+        # the first wakeup, fall back to plain sleeps to avoid spinning.
+        wait_for_output = True
         while True:
             if not self.getecho():
                 return True
-            if timeout < 0 and timeout is not None:
-                return False
             if timeout is not None:
                 timeout = end_time - time.time()
-            time.sleep(0.1)
+                if timeout < 0:
+                    return False
+                wait = min(delay, timeout)
+            else:
+                wait = delay
+            if wait_for_output:
+                if _wait_readable(self.fd, wait):
+                    wait_for_output = False
+            else:
+                time.sleep(wait)
+            delay = min(delay * 2, 0.1)
 
     def getecho(self):
         '''Returns True if terminal echo is on, or False if echo is off.
@@ -522,20 +832,12 @@ class PtyProcess(object):
         Linux, and the empty-string return used on BSD platforms and (seemingly)
         on recent Solaris.
         """
-        try:
-            s = self.fileobj.read1(size)
-        except (OSError, IOError) as err:
-            if err.args[0] == errno.EIO:
-                # Linux-style EOF
-                self.flag_eof = True
-                raise EOFError('End Of File (EOF). Exception style platform.')
-            raise
-        if s == b'':
-            # BSD-style EOF (also appears to work on recent Solaris (OpenIndiana))
-            self.flag_eof = True
-            raise EOFError('End Of File (EOF). Empty string style platform.')
-
-        return s
+        if self._read_buffer:
+            # Left over from readline()
+            s = self._read_buffer[:size]
+            self._read_buffer = self._read_buffer[size:]
+            return s
+        return self._read_fd(size)
 
     def readline(self):
         """Read one line from the pseudoterminal, and return it as unicode.
@@ -543,9 +845,27 @@ class PtyProcess(object):
         Can block if there is nothing to read. Raises :exc:`EOFError` if the
         terminal was closed.
         """
+        buf = self._read_buffer
+        start = 0
+        while True:
+            end = buf.find(b'\n', start) + 1
+            if end:
+                self._read_buffer = buf[end:]
+                return buf[:end]
+            start = len(buf)
+            try:
+                buf += self._read_fd(io.DEFAULT_BUFFER_SIZE)
+            except EOFError:
+                # Return a final line with no newline; raise on the next call.
+                if not buf:
+                    raise
+                self._read_buffer = b''
+                return buf
+
+    def _read_fd(self, size):
         try:
-            s = self.fileobj.readline()
-        except (OSError, IOError) as err:
+            s = os.read(self.fd, size)
+        except OSError as err:
             if err.args[0] == errno.EIO:
                 # Linux-style EOF
                 self.flag_eof = True
@@ -558,19 +878,58 @@ class PtyProcess(object):
 
         return s
 
+    def _write_all(self, b):
+        # Slice a memoryview on short writes, so the rest isn't copied.
+        b = memoryview(b)
+        n = 0
+        while n < len(b):
+            n += os.write(self.fd, b[n:])
+
     def _writeb(self, b, flush=True):
-        n = self.fileobj.write(b)
-        if flush:
-            self.fileobj.flush()
-        return n
+        if self._write_buffer or not flush:
+            self._write_buffer += b
+            if flush or len(self._write_buffer) >= io.DEFAULT_BUFFER_SIZE:
+                self.flush()
+        else:
+            self._write_all(b)
+        return len(b)
 
     def write(self, s, flush=True):
         """Write bytes to the pseudoterminal.
-        
+
+        If ``flush`` is False, the data may be held back and sent together
+        with later writes, saving system calls when sending many small
+        pieces. It is sent by the next write with ``flush=True``, or by
+        :meth:`flush`.
+
         Returns the number of bytes written.
         """
         return self._writeb(s, flush=flush)
 
+    def writelines(self, lines):
+        """Write a sequence of bytes objects to the pseudoterminal.
+
+        Where possible they are sent together with a single ``writev`` system
+        call, rather than one ``write`` each.
+
+        Returns the number of bytes written.
+        """
+        lines = list(lines)
+        self.flush()
+        if not _has_writev:
+            return self._writeb(b''.join(lines))
+        n = 0
+        for i in range(0, len(lines), _iov_max):
+            bufs = lines[i:i + _iov_max]
+            written = os.writev(self.fd, bufs)
+            size = sum(len(b) for b in bufs)
+            if written < size:
+                # Short write; send the rest the simple way.
+                self._write_all(b''.join(bufs)[written:])
+                written = size
+            n += written
+        return n
+
     def sendcontrol(self, char):
         '''Helper method for sending control characters to the terminal.
 
@@ -580,23 +939,9 @@ class PtyProcess(object):
 
         See also, :meth:`sendintr` and :meth:`sendeof`.
         '''
-        char = char.lower()
-        a = ord(char)
-        if 97 <= a <= 122:
-            a = a - ord('a') + 1
-            byte = _byte(a)
-            return self._writeb(byte), byte
-        d = {'@': 0, '`': 0,
-            '[': 27, '{': 27,
-            '\\': 28, '|': 28,
-            ']': 29, '}': 29,
-            '^': 30, '~': 30,
-            '_': 31,
-            '?': 127}
-        if char not in d:
+        byte = _CONTROL_CHARS.get(char.lower())
+        if byte is None:
             return 0, b''
-
-        byte = _byte(d[char])
         return self._writeb(byte), byte
 
     def sendeof(self):
@@ -632,6 +977,16 @@ class PtyProcess(object):
 
         return self.flag_eof
 
+    def _wait_for_exit(self, timeout):
+        '''Wait up to ``timeout`` seconds for the child to exit.
+
+        This returns soon after the child exits: immediately where the
+        platform can notify us, or else by polling with a growing interval.
+        The child is not reaped, so callers should check :meth:`isalive`
+        afterwards.
+        '''
+        _wait_exit(self.pid, self._pidfd, timeout)
+
     def terminate(self, force=False):
         '''This forces a child process to terminate. It starts nicely with
         SIGHUP and SIGINT. If "force" is True then moves onto SIGKILL. This
@@ -640,33 +995,24 @@ class PtyProcess(object):
 
         if not self.isalive():
             return True
+        signals = [signal.SIGHUP, signal.SIGCONT, signal.SIGINT]
+        if force:
+            signals.append(signal.SIGKILL)
         try:
-            self.kill(signal.SIGHUP)
-            time.sleep(self.delayafterterminate)
-            if not self.isalive():
-                return True
-            self.kill(signal.SIGCONT)
-            time.sleep(self.delayafterterminate)
-            if not self.isalive():
-                return True
-            self.kill(signal.SIGINT)
-            time.sleep(self.delayafterterminate)
-            if not self.isalive():
-                return True
-            if force:
-                self.kill(signal.SIGKILL)
-                time.sleep(self.delayafterterminate)
+            for sig in signals:
+                # We've just seen the child alive, so signal it directly
+                # rather than through kill(), which would waitpid() again.
+                os.kill(self.pid, sig)
+                self._wait_for_exit(self.delayafterterminate)
                 if not self.isalive():
                     return True
-                else:
-                    return False
             return False
         except OSError:
             # I think there are kernel timing issues that sometimes cause
             # this to happen. I think isalive() reports True, but the
             # process is dead to the kernel.
             # Make one last attempt to see if the kernel is up to date.
-            time.sleep(self.delayafterterminate)
+            self._wait_for_exit(self.delayafterterminate)
             if not self.isalive():
                 return True
             else:
@@ -683,17 +1029,16 @@ class PtyProcess(object):
             pid, status = os.waitpid(self.pid, 0)
         else:
             return self.exitstatus
-        self.exitstatus = os.WEXITSTATUS(status)
         if os.WIFEXITED(status):
             self.status = status
             self.exitstatus = os.WEXITSTATUS(status)
             self.signalstatus = None
-            self.terminated = True
+            self.terminated = self._finalize_state.terminated = True
         elif os.WIFSIGNALED(status):
             self.status = status
             self.exitstatus = None
             self.signalstatus = os.WTERMSIG(status)
-            self.terminated = True
+            self.terminated = self._finalize_state.terminated = True
         elif os.WIFSTOPPED(status):  # pragma: no cover
             # You can't call wait() on a child process in the stopped state.
             raise PtyProcessError('Called wait() on a stopped child ' +
@@ -736,7 +1081,9 @@ class PtyProcess(object):
         # I can't even believe that I figured this out...
         # If waitpid() returns 0 it means that no child process
         # wishes to report, and the value of status is undefined.
-        if pid == 0:
+        # Other platforms report status on the first call, so only pay for
+        # the second syscall where it's needed.
+        if pid == 0 and _is_solaris:
             try:
                 ### os.WNOHANG) # Solaris!
                 pid, status = os.waitpid(self.pid, waitpid_options)
@@ -765,12 +1112,12 @@ class PtyProcess(object):
             self.status = status
             self.exitstatus = os.WEXITSTATUS(status)
             self.signalstatus = None
-            self.terminated = True
+            self.terminated = self._finalize_state.terminated = True
         elif os.WIFSIGNALED(status):
             self.status = status
             self.exitstatus = None
             self.signalstatus = os.WTERMSIG(status)
-            self.terminated = True
+            self.terminated = self._finalize_state.terminated = True
         elif os.WIFSTOPPED(status):
             raise PtyProcessError('isalive() encountered condition ' +
                     'where child process is stopped. This is not ' +
@@ -793,10 +1140,8 @@ class PtyProcess(object):
     def getwinsize(self):
         """Return the window size of the pseudoterminal as a tuple (rows, cols).
         """
-        TIOCGWINSZ = getattr(termios, 'TIOCGWINSZ', 1074295912)
-        s = struct.pack('HHHH', 0, 0, 0, 0)
-        x = fcntl.ioctl(self.fd, TIOCGWINSZ, s)
-        return struct.unpack('HHHH', x)[0:2]
+        x = fcntl.ioctl(self.fd, _TIOCGWINSZ, _winsize_empty)
+        return _winsize.unpack(x)[0:2]
 
     def setwinsize(self, rows, cols):
         """Set the terminal window size of the child tty.
@@ -809,22 +1154,36 @@ class PtyProcess(object):
         return _setwinsize(self.fd, rows, cols)
 
 
+# Codecs which decode ASCII bytes as the same characters, with no state
+# carried between them.
+_ascii_encodings = frozenset(['ascii', 'utf-8', 'iso8859-1', 'cp1252'])
+
 class PtyProcessUnicode(PtyProcess):
     """Unicode wrapper around a process running in a pseudoterminal.
 
     This class exposes a similar interface to :class:`PtyProcess`, but its read
     methods return unicode, and its :meth:`write` accepts unicode.
     """
-    if PY3:
-        string_type = str
-    else:
-        string_type = unicode   # analysis:ignore
+    string_type = str
 
     def __init__(self, pid, fd, encoding='utf-8', codec_errors='strict'):
         super(PtyProcessUnicode, self).__init__(pid, fd)
         self.encoding = encoding
         self.codec_errors = codec_errors
         self.decoder = codecs.getincrementaldecoder(encoding)(errors=codec_errors)
+        # Whether ASCII input can be decoded without the incremental decoder:
+        # the encoding must agree with ASCII, and the decoder must not be
+        # holding part of a character from the last read.
+        self._ascii_compatible = codecs.lookup(encoding).name in _ascii_encodings
+        self._ascii_fast_path = self._ascii_compatible
+
+    def _decode(self, b):
+        if self._ascii_fast_path and b.isascii():
+            return b.decode('ascii')
+        s = self.decoder.decode(b, final=False)
+        self._ascii_fast_path = (self._ascii_compatible
+                                 and not self.decoder.getstate()[0])
+        return s
 
     def read(self, size=1024):
         """Read at most ``size`` bytes from the pty, return them as unicode.
@@ -835,7 +1194,7 @@ class PtyProcessUnicode(PtyProcess):
         The size argument still refers to bytes, not unicode code points.
         """
         b = super(PtyProcessUnicode, self).read(size)
-        return self.decoder.decode(b, final=False)
+        return self._decode(b)
 
     def readline(self):
         """Read one line from the pseudoterminal, and return it as unicode.
@@ -844,12 +1203,20 @@ class PtyProcessUnicode(PtyProcess):
         terminal was closed.
         """
         b = super(PtyProcessUnicode, self).readline()
-        return self.decoder.decode(b, final=False)
+        return self._decode(b)
 
-    def write(self, s):
+    def write(self, s, flush=True):
         """Write the unicode string ``s`` to the pseudoterminal.
 
         Returns the number of bytes written.
         """
         b = s.encode(self.encoding)
-        return super(PtyProcessUnicode, self).write(b)
+        return super(PtyProcessUnicode, self).write(b, flush=flush)
+
+    def writelines(self, lines):
+        """Write a sequence of unicode strings to the pseudoterminal.
+
+        Returns the number of bytes written.
+        """
+        lines = [s.encode(self.encoding) for s in lines]
+        return super(PtyProcessUnicode, self).writelines(lines)
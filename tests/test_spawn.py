@@ -1,9 +1,13 @@
+import errno
 import fcntl
 import os
 import time
 import select
+import shutil
+import signal
 import tempfile
 import unittest
+import ptyprocess.ptyprocess
 from ptyprocess.ptyprocess import which
 from ptyprocess import PtyProcess, PtyProcessUnicode
 
@@ -148,3 +152,150 @@ class PtyTestCase(unittest.TestCase):
 
             with open(temp_file_name, 'r') as temp_file_r:
                 assert temp_file_r.read() == 'hello'
+
+    def test_sendcontrol(self):
+        p = PtyProcess.spawn(['cat'])
+        assert p.sendcontrol('g') == (1, b'\x07')
+        assert p.sendcontrol('G') == (1, b'\x07')
+        assert p.sendcontrol('?') == (1, b'\x7f')
+        assert p.sendcontrol('1') == (0, b'')
+        p.close()
+
+    def test_readline(self):
+        # Both lines arrive in one chunk; the second must come from the
+        # read buffer rather than being lost.
+        p = PtyProcess.spawn(['printf', 'one\ntwo\n'])
+        assert p.readline() == b'one\r\n'
+        assert p.readline() == b'two\r\n'
+        self.assertRaises(EOFError, p.readline)
+        assert p.wait() == 0
+
+    def test_sendintr(self):
+        p = PtyProcess.spawn(['cat'])
+        assert p.sendintr()[0] == 1
+        p.wait()
+        assert p.signalstatus == signal.SIGINT
+
+    def test_winsize(self):
+        p = PtyProcess.spawn(['cat'], dimensions=(30, 100))
+        assert p.getwinsize() == (30, 100)
+        p.setwinsize(40, 120)
+        assert p.getwinsize() == (40, 120)
+        p.close()
+
+    def test_read_after_readline(self):
+        p = PtyProcess.spawn(['printf', 'one\ntwo'])
+        assert p.readline() == b'one\r\n'
+        assert p.read(2) == b'tw'
+        assert p.readline() == b'o'
+        self.assertRaises(EOFError, p.read)
+        assert p.wait() == 0
+
+    def test_writelines(self):
+        p = PtyProcessUnicode.spawn(['cat'], echo=False)
+        assert p.writelines([u'foo', u'bar', u'\n']) == 7
+        outp = u''
+        while u'\n' not in outp:
+            outp += p.read()
+        assert outp == u'foobar\r\n'
+        p.close()
+
+    def test_read_unicode_split_character(self):
+        p = PtyProcessUnicode.spawn(['printf', 'a\\303\\251b'])
+        # Read one byte at a time, so the two byte character is split.
+        outp = u''
+        while True:
+            try:
+                outp += p.read(1)
+            except EOFError:
+                break
+        assert outp == u'a\xe9b'
+
+    def test_write_noflush(self):
+        p = PtyProcess.spawn(['cat'], echo=False)
+        assert p.write(b'foo', flush=False) == 3
+        # Nothing has been sent yet.
+        assert not self._canread(p.fd, timeout=0.1)
+        p.write(b'bar\n')
+        outp = b''
+        while b'\n' not in outp:
+            outp += p.read()
+        assert outp == b'foobar\r\n'
+        p.write(b'baz\n', flush=False)
+        p.flush()
+        assert p.readline() == b'baz\r\n'
+        p.close()
+
+    def test_close_failed_flush(self):
+        p = PtyProcess.spawn(['cat'], echo=False)
+        p.write(b'foo', flush=False)
+        def _write_all(b):
+            raise OSError(errno.EIO, 'Input/output error')
+        p._write_all = _write_all
+        with self.assertRaises(OSError):
+            p.close()
+        # The pty is closed anyway, and the data isn't tried again.
+        assert p.fd == -1
+        p.close()
+        assert p.closed
+        assert not p.isalive()
+
+    def test_spawn_directory(self):
+        with self.assertRaises(FileNotFoundError):
+            PtyProcess.spawn([tempfile.gettempdir()])
+
+    def test_spawn_moved_command(self):
+        dirs = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+        for d in dirs:
+            self.addCleanup(shutil.rmtree, d)
+        paths = [os.path.join(d, 'ptyprocess-test-cmd') for d in dirs]
+        with open(paths[0], 'w') as f:
+            f.write('#!/bin/sh\nexit 0\n')
+        os.chmod(paths[0], 0o755)
+        self.addCleanup(os.environ.__setitem__, 'PATH', os.environ['PATH'])
+        os.environ['PATH'] = os.pathsep.join(dirs + [os.defpath])
+
+        assert PtyProcess.spawn(['ptyprocess-test-cmd']).wait() == 0
+        # Moved to a later $PATH entry: found again rather than using the
+        # remembered location.
+        os.rename(paths[0], paths[1])
+        assert PtyProcess.spawn(['ptyprocess-test-cmd']).wait() == 0
+        os.unlink(paths[1])
+        with self.assertRaises(FileNotFoundError):
+            PtyProcess.spawn(['ptyprocess-test-cmd'])
+
+
+class PtyForkTestCase(PtyTestCase):
+    """Run the same tests with spawn() using fork() instead of posix_spawn()."""
+    def setUp(self):
+        super(PtyForkTestCase, self).setUp()
+        self.addCleanup(setattr, ptyprocess.ptyprocess, '_use_posix_spawn',
+                        ptyprocess.ptyprocess._use_posix_spawn)
+        ptyprocess.ptyprocess._use_posix_spawn = False
+
+    @unittest.skipUnless(hasattr(os, 'posix_spawn'), "No posix_spawn().")
+    def test_posix_spawn_unsupported(self):
+        # Python raises NotImplementedError for setsid=True when built
+        # without POSIX_SPAWN_SETSID; spawn() should fall back to fork().
+        def posix_spawn(*args, **kwargs):
+            raise NotImplementedError
+        self.addCleanup(setattr, os, 'posix_spawn', os.posix_spawn)
+        os.posix_spawn = posix_spawn
+        ptyprocess.ptyprocess._use_posix_spawn = True
+
+        p = PtyProcess.spawn(['true'])
+        assert p.wait() == 0
+        assert not ptyprocess.ptyprocess._use_posix_spawn
+
+    @unittest.skipUnless(hasattr(os, 'posix_spawn'), "No posix_spawn().")
+    def test_posix_spawn_no_ttyname(self):
+        # If the pty can't be found by name, spawn() should fall back to
+        # fork(), which doesn't need to reopen it.
+        def ttyname(fd):
+            raise OSError(errno.ENODEV, 'No such device')
+        self.addCleanup(setattr, os, 'ttyname', os.ttyname)
+        os.ttyname = ttyname
+        ptyprocess.ptyprocess._use_posix_spawn = True
+
+        p = PtyProcess.spawn(['sh', '-c', 'test -t 0'])
+        assert p.wait() == 0
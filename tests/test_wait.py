@@ -1,7 +1,10 @@
 """ Test cases for PtyProcess.wait method. """
+import gc
+import os
 import time
 import unittest
-from ptyprocess import PtyProcess
+import weakref
+from ptyprocess import PtyProcess, PtyProcessError
 
 
 class TestWaitAfterTermination(unittest.TestCase):
@@ -30,3 +33,38 @@ class TestWaitAfterTermination(unittest.TestCase):
         # this call to wait() will block for 1s
         for count in range(2):
             self.assertEqual(child.wait(), 0, count)
+
+    def test_terminate_longproc(self):
+        """Ensure terminate() stops a long-lived process."""
+        child = PtyProcess.spawn(['sleep', '30'])
+        self.assertTrue(child.terminate(force=True))
+        self.assertFalse(child.isalive())
+        self.assertIsNotNone(child.signalstatus)
+
+    def test_close_unterminated(self):
+        """Ensure a failed close() doesn't leave the pty fd to be closed again."""
+        child = PtyProcess.spawn(
+            ['sh', '-c', "trap '' HUP INT CONT; echo ready; sleep 30"])
+        child.readline()
+        child.delayafterclose = child.delayafterterminate = 0.01
+        with self.assertRaises(PtyProcessError):
+            child.close(force=False)
+        self.assertEqual(child.fd, -1)
+        self.assertFalse(child.closed)
+        child.close(force=True)
+        self.assertTrue(child.closed)
+        self.assertFalse(child.isalive())
+
+    def test_collect_cycle(self):
+        """Ensure an unclosed instance in a reference cycle is cleaned up."""
+        child = PtyProcess.spawn(['sleep', '30'])
+        child.callback = child.isalive
+        ref = weakref.ref(child)
+        fd, pid = child.fd, child.pid
+        del child
+        gc.collect()
+        self.assertIsNone(ref())
+        with self.assertRaises(OSError):
+            os.fstat(fd)
+        with self.assertRaises(ChildProcessError):
+            os.waitpid(pid, os.WNOHANG)